@@ -1,78 +1,434 @@
+import functools
+import importlib.util
+import logging
 import os
-from typing import Any, Dict, cast
+import sys
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, ClassVar
 
-from chromadb import Documents, EmbeddingFunction, Embeddings
-from chromadb.api.types import validate_embedding_function
+if TYPE_CHECKING:
+    from chromadb import Documents, EmbeddingFunction, Embeddings
 
+_CHROMADB_ATTRS = frozenset({"Documents", "EmbeddingFunction", "Embeddings"})
 
-class EmbeddingConfigurator:
-    def __init__(self):
-        self.embedding_functions = {
-            "openai": self._configure_openai,
-            "azure": self._configure_azure,
-            "ollama": self._configure_ollama,
-            "vertexai": self._configure_vertexai,
-            "google": self._configure_google,
-            "cohere": self._configure_cohere,
-            "bedrock": self._configure_bedrock,
-            "huggingface": self._configure_huggingface,
-            "watson": self._configure_watson,
-        }
 
+def __getattr__(name: str):
+    """Resolve chromadb re-exports on demand.
+
+    chromadb drags in numpy, onnxruntime and friends, so importing it
+    eagerly penalizes every `crewai` import even when no embedder is used.
+    """
+    if name in _CHROMADB_ATTRS:
+        import chromadb
+
+        return getattr(chromadb, name)
+    if name == "validate_embedding_function":
+        from chromadb.api.types import validate_embedding_function
+
+        return validate_embedding_function
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.lru_cache(maxsize=None)
+def _lazy_module(name: str):
+    """Return the named module, loading it lazily and at most once.
+
+    The module body is only executed on first attribute access, and repeat
+    calls for the same provider SDK hit the cache instead of re-running the
+    import machinery.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load embedding provider module: {name}")
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+logger = logging.getLogger(__name__)
+
+_ENV_OPENAI_KEY = os.environ.get("OPENAI_API_KEY")
+
+
+def refresh_env() -> None:
+    """Re-read environment variables captured at import time.
+
+    Intended for tests and long-lived daemons that re-key the process after
+    this module has been imported.
+    """
+    global _ENV_OPENAI_KEY
+    _ENV_OPENAI_KEY = os.environ.get("OPENAI_API_KEY")
+
+
+_VALIDATED: "weakref.WeakSet[EmbeddingFunction]" = weakref.WeakSet()
+
+
+def _validate_once(embedding_function: "EmbeddingFunction") -> None:
+    """Validate a custom embedding function at most once per object.
+
+    chromadb's validator invokes the function against sample documents, which
+    can hit the network, so already-validated objects are skipped.
+    """
+    if embedding_function in _VALIDATED:
+        return
+    from chromadb.api.types import validate_embedding_function
+
+    validate_embedding_function(embedding_function)
+    try:
+        _VALIDATED.add(embedding_function)
+    except TypeError:
+        pass  # not weak-referenceable; validate again next time
+
+
+_WATSON_CLS = None
+
+
+def _get_watson_embedding_function_cls():
+    """Define the Watson embedding class once, after a successful SDK import."""
+    global _WATSON_CLS
+    if _WATSON_CLS is None:
+        from chromadb import Documents, EmbeddingFunction, Embeddings
+
+        try:
+            import ibm_watsonx_ai.foundation_models as watson_models
+            from ibm_watsonx_ai import Credentials
+            from ibm_watsonx_ai.metanames import (
+                EmbedTextParamsMetaNames as EmbedParams,
+            )
+        except ImportError as e:
+            raise ImportError(
+                "IBM Watson dependencies are not installed. Please install them to use Watson embedding."
+            ) from e
+
+        class WatsonEmbeddingFunction(EmbeddingFunction):
+            """Embeds documents through a watsonx client authenticated once at init."""
+
+            __slots__ = ("_embedder",)
+
+            _MAX_BATCH_SIZE = 1000
+            _DEFAULT_EMBED_PARAMS = {
+                EmbedParams.TRUNCATE_INPUT_TOKENS: 512,
+                EmbedParams.RETURN_OPTIONS: {"input_text": True},
+            }
+
+            def __init__(self, config: dict[str, Any]):
+                # Defensive copy, nested dict included: the SDK receives a
+                # mutable params dict, and a shared one would leak mutations
+                # into every later instance.
+                embed_params = dict(self._DEFAULT_EMBED_PARAMS)
+                embed_params[EmbedParams.RETURN_OPTIONS] = {"input_text": True}
+                truncate = config.get("truncate_input_tokens", 512)
+                if truncate != 512:
+                    embed_params[EmbedParams.TRUNCATE_INPUT_TOKENS] = truncate
+
+                self._embedder = watson_models.Embeddings(
+                    model_id=config.get("model"),
+                    params=embed_params,
+                    credentials=Credentials(
+                        api_key=config.get("api_key"), url=config.get("api_url")
+                    ),
+                    project_id=config.get("project_id"),
+                )
+
+            def __call__(self, input: Documents) -> Embeddings:
+                try:
+                    embeddings = []
+                    for start in range(0, len(input), self._MAX_BATCH_SIZE):
+                        embeddings.extend(
+                            self._embedder.embed_documents(
+                                input[start : start + self._MAX_BATCH_SIZE]
+                            )
+                        )
+                    return embeddings
+                except Exception:
+                    logger.exception("Error during Watson embedding")
+                    raise
+
+        _WATSON_CLS = WatsonEmbeddingFunction
+    return _WATSON_CLS
+
+
+_CACHING_EF_CLS = None
+
+
+def _get_caching_embedding_function_cls():
+    """Define the caching wrapper class once, deferring the chromadb import."""
+    global _CACHING_EF_CLS
+    if _CACHING_EF_CLS is None:
+        import collections
+        import hashlib
+
+        import numpy as np
+        from chromadb import Documents, EmbeddingFunction, Embeddings
+
+        class _CachingEmbeddingFunction(EmbeddingFunction):
+            """Memoizes embeddings by content hash in a bounded LRU.
+
+            Embeddings are deterministic per (provider, model, text), and agent
+            runs frequently re-embed identical chunks (tool outputs, prompt
+            fragments), so cache hits skip the remote API call entirely.
+
+            CREWAI_EMBED_QUANT=int8 stores cached vectors as int8 with a
+            per-vector scale (4x smaller than float32, typically <0.5% recall
+            loss for RAG); fp16 halves the footprint instead. Default is
+            unquantized.
+            """
+
+            __slots__ = ("_inner", "_cache", "_matrix", "_quant")
+
+            _CAP = 10_000
+
+            def __init__(self, inner):
+                self._inner = inner
+                self._cache = collections.OrderedDict()
+                self._matrix = None
+                self._quant = os.getenv("CREWAI_EMBED_QUANT", "none").lower()
+
+            def _pack(self, vector):
+                if self._quant == "int8":
+                    v = np.asarray(vector, dtype=np.float32)
+                    scale = float(np.max(np.abs(v))) / 127.0
+                    if scale == 0.0:
+                        scale = 1.0
+                    return np.round(v / scale).astype(np.int8), scale
+                if self._quant == "fp16":
+                    return np.asarray(vector, dtype=np.float16)
+                return vector
+
+            def _unpack(self, entry):
+                if self._quant == "int8":
+                    quantized, scale = entry
+                    return (quantized.astype(np.float32) * scale).tolist()
+                if self._quant == "fp16":
+                    return entry.astype(np.float32).tolist()
+                return entry
+
+            def __call__(self, input: Documents) -> Embeddings:
+                cache = self._cache
+                keys = [hashlib.sha256(text.encode()).digest() for text in input]
+                embeddings = [None] * len(keys)
+                miss_indices = []
+                for i, key in enumerate(keys):
+                    if key in cache:
+                        # Refresh hits before inserting misses so eviction
+                        # below can never drop a key from this batch.
+                        cache.move_to_end(key)
+                        embeddings[i] = self._unpack(cache[key])
+                    else:
+                        miss_indices.append(i)
+                if miss_indices:
+                    fresh = self._inner([input[i] for i in miss_indices])
+                    for i, vector in zip(miss_indices, fresh):
+                        embeddings[i] = vector
+                        cache[keys[i]] = self._pack(vector)
+                        cache.move_to_end(keys[i])
+                    while len(cache) > self._CAP:
+                        cache.popitem(last=False)
+                return embeddings
+
+            def embed_and_normalize(self, input: Documents) -> "np.ndarray":
+                """Embed input and return L2-normalized float32 vectors.
+
+                The contiguous (N, D) layout lets downstream similarity run as
+                a single BLAS product (``matrix @ query``) instead of a
+                Python-loop cosine, and float32 halves the bytes moved versus
+                float64 lists.
+                """
+                if len(input) == 0:
+                    self._matrix = np.empty((0, 0), dtype=np.float32)
+                    return self._matrix
+                vectors = np.ascontiguousarray(
+                    np.asarray(self(input), dtype=np.float32)
+                )
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                vectors /= norms
+                self._matrix = vectors
+                return vectors
+
+            def as_matrix(self) -> "np.ndarray | None":
+                """Return the matrix from the most recent embed_and_normalize call."""
+                return self._matrix
+
+        _CACHING_EF_CLS = _CachingEmbeddingFunction
+    return _CACHING_EF_CLS
+
+
+_CONFIGURE_CACHE: dict[Any, "EmbeddingFunction"] = {}
+_CONFIGURE_CACHE_CAP = 32
+
+
+def _freeze(value):
+    """Recursively convert a config value into a hashable cache key.
+
+    Dicts become sorted item tuples and lists become tuples. Raises TypeError
+    for configs that cannot be frozen (e.g. boto sessions); callers fall
+    through to the uncached path.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    hash(value)
+    return value
+
+
+_CONCURRENT_EF_CLS = None
+
+
+def _get_concurrent_embedding_function_cls():
+    """Define the concurrent wrapper class once, deferring the chromadb import."""
+    global _CONCURRENT_EF_CLS
+    if _CONCURRENT_EF_CLS is None:
+        import asyncio
+
+        from chromadb import Documents, EmbeddingFunction, Embeddings
+
+        class _ConcurrentEmbeddingFunction(EmbeddingFunction):
+            """Overlaps per-document embedding requests with bounded concurrency.
+
+            Useful for providers whose chromadb wrappers issue one blocking
+            HTTP request per document: network latency is paid once per batch
+            of max_concurrency instead of once per document.
+            """
+
+            __slots__ = ("_inner", "_max_concurrency")
+
+            def __init__(self, inner, max_concurrency: int = 8):
+                self._inner = inner
+                self._max_concurrency = max_concurrency
+
+            async def _gather(self, input: Documents) -> Embeddings:
+                loop = asyncio.get_running_loop()
+                semaphore = asyncio.Semaphore(self._max_concurrency)
+
+                async def embed_one(text):
+                    async with semaphore:
+                        return await loop.run_in_executor(
+                            None, lambda: self._inner([text])[0]
+                        )
+
+                return list(await asyncio.gather(*(embed_one(text) for text in input)))
+
+            def __call__(self, input: Documents) -> Embeddings:
+                if len(input) <= 1:
+                    return self._inner(input)
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return asyncio.run(self._gather(input))
+                # Already inside an event loop; asyncio.run would raise, so
+                # fall back to the sequential path.
+                return self._inner(input)
+
+        _CONCURRENT_EF_CLS = _ConcurrentEmbeddingFunction
+    return _CONCURRENT_EF_CLS
+
+
+def _maybe_parallel(embedding_function, config):
+    """Wrap the function for concurrent embedding when config enables it."""
+    if config.get("parallel"):
+        return _get_concurrent_embedding_function_cls()(
+            embedding_function, max_concurrency=config.get("max_concurrency", 8)
+        )
+    return embedding_function
+
+
+def _get_openai_ef():
+    """Return the OpenAIEmbeddingFunction class, shared by all OpenAI-style paths."""
+    return _lazy_module(
+        "chromadb.utils.embedding_functions.openai_embedding_function"
+    ).OpenAIEmbeddingFunction
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_openai_embedding_function(api_key: str, model_name: str | None):
+    """Build an OpenAI embedding function once per resolved (key, model).
+
+    Config shape rarely varies within a crew run, so the arguments are bound
+    once and repeat configurations reuse the same instance, skipping both the
+    config-dict lookups and the HTTP client allocation in
+    OpenAIEmbeddingFunction.__init__.
+    """
+    return _get_openai_ef()(api_key=api_key or None, model_name=model_name)
+
+
+class EmbeddingConfigurator:
     def configure_embedder(
         self,
-        embedder_config: Dict[str, Any] | None = None,
-    ) -> EmbeddingFunction:
+        embedder_config: dict[str, Any] | None = None,
+    ) -> "EmbeddingFunction":
         """Configures and returns an embedding function based on the provided config."""
         if embedder_config is None:
             return self._create_default_embedding_function()
 
+        # The cached value is the post-wrapping function, so the wrap flag
+        # must be part of the key or toggling it would return stale entries.
+        embed_cache_enabled = os.getenv("CREWAI_EMBED_CACHE") == "1"
+        try:
+            cache_key = (embed_cache_enabled, _freeze(embedder_config))
+        except TypeError:
+            cache_key = None
+        if cache_key is not None:
+            cached = _CONFIGURE_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
+
         provider = embedder_config.get("provider")
+        if isinstance(provider, str):
+            provider = sys.intern(provider.strip().lower())
         config = embedder_config.get("config", {})
         model_name = config.get("model")
 
-        if isinstance(provider, EmbeddingFunction):
-            try:
-                validate_embedding_function(provider)
-                return provider
-            except Exception as e:
-                raise ValueError(f"Invalid custom embedding function: {str(e)}")
+        if provider is not None and not isinstance(provider, str):
+            from chromadb import EmbeddingFunction
+
+            if isinstance(provider, EmbeddingFunction):
+                try:
+                    _validate_once(provider)
+                    return provider
+                except Exception as e:
+                    raise ValueError(f"Invalid custom embedding function: {str(e)}")
 
-        if provider not in self.embedding_functions:
+        try:
+            configure = type(self)._PROVIDERS[provider]
+        except KeyError:
             raise Exception(
-                f"Unsupported embedding provider: {provider}, supported providers: {list(self.embedding_functions.keys())}"
+                f"Unsupported embedding provider: {provider}, supported providers: {self._SUPPORTED_TUPLE}"
             )
 
-        return self.embedding_functions[provider](config, model_name)
+        embedding_function = configure(config, model_name)
+        if embed_cache_enabled:
+            embedding_function = _get_caching_embedding_function_cls()(
+                embedding_function
+            )
+        if cache_key is not None:
+            if len(_CONFIGURE_CACHE) >= _CONFIGURE_CACHE_CAP:
+                _CONFIGURE_CACHE.pop(next(iter(_CONFIGURE_CACHE)))
+            _CONFIGURE_CACHE[cache_key] = embedding_function
+        return embedding_function
 
     @staticmethod
     def _create_default_embedding_function():
-        from chromadb.utils.embedding_functions.openai_embedding_function import (
-            OpenAIEmbeddingFunction,
-        )
-
-        return OpenAIEmbeddingFunction(
-            api_key=os.getenv("OPENAI_API_KEY"), model_name="text-embedding-3-small"
+        return _cached_openai_embedding_function(
+            _ENV_OPENAI_KEY or "",
+            os.getenv("CREWAI_EMBEDDING_MODEL", "text-embedding-3-small"),
         )
 
     @staticmethod
     def _configure_openai(config, model_name):
-        from chromadb.utils.embedding_functions.openai_embedding_function import (
-            OpenAIEmbeddingFunction,
-        )
-
-        return OpenAIEmbeddingFunction(
-            api_key=config.get("api_key") or os.getenv("OPENAI_API_KEY"),
-            model_name=model_name,
+        return _cached_openai_embedding_function(
+            config.get("api_key") or _ENV_OPENAI_KEY or "",
+            model_name,
         )
 
     @staticmethod
     def _configure_azure(config, model_name):
-        from chromadb.utils.embedding_functions.openai_embedding_function import (
-            OpenAIEmbeddingFunction,
-        )
-
-        return OpenAIEmbeddingFunction(
+        return _get_openai_ef()(
             api_key=config.get("api_key"),
             api_base=config.get("api_base"),
             api_type=config.get("api_type", "azure"),
@@ -82,103 +438,94 @@ class EmbeddingConfigurator:
 
     @staticmethod
     def _configure_ollama(config, model_name):
-        from chromadb.utils.embedding_functions.ollama_embedding_function import (
-            OllamaEmbeddingFunction,
+        ollama_ef = _lazy_module(
+            "chromadb.utils.embedding_functions.ollama_embedding_function"
         )
 
-        return OllamaEmbeddingFunction(
+        return ollama_ef.OllamaEmbeddingFunction(
             url=config.get("url", "http://localhost:11434/api/embeddings"),
             model_name=model_name,
         )
 
     @staticmethod
     def _configure_vertexai(config, model_name):
-        from chromadb.utils.embedding_functions.google_embedding_function import (
-            GoogleVertexEmbeddingFunction,
+        google_ef = _lazy_module(
+            "chromadb.utils.embedding_functions.google_embedding_function"
         )
 
-        return GoogleVertexEmbeddingFunction(
+        return google_ef.GoogleVertexEmbeddingFunction(
             model_name=model_name,
             api_key=config.get("api_key"),
         )
 
     @staticmethod
     def _configure_google(config, model_name):
-        from chromadb.utils.embedding_functions.google_embedding_function import (
-            GoogleGenerativeAiEmbeddingFunction,
+        google_ef = _lazy_module(
+            "chromadb.utils.embedding_functions.google_embedding_function"
         )
 
-        return GoogleGenerativeAiEmbeddingFunction(
+        return google_ef.GoogleGenerativeAiEmbeddingFunction(
             model_name=model_name,
             api_key=config.get("api_key"),
         )
 
     @staticmethod
     def _configure_cohere(config, model_name):
-        from chromadb.utils.embedding_functions.cohere_embedding_function import (
-            CohereEmbeddingFunction,
+        cohere_ef = _lazy_module(
+            "chromadb.utils.embedding_functions.cohere_embedding_function"
         )
 
-        return CohereEmbeddingFunction(
-            model_name=model_name,
-            api_key=config.get("api_key"),
+        return _maybe_parallel(
+            cohere_ef.CohereEmbeddingFunction(
+                model_name=model_name,
+                api_key=config.get("api_key"),
+            ),
+            config,
         )
 
     @staticmethod
     def _configure_bedrock(config, model_name):
-        from chromadb.utils.embedding_functions.amazon_bedrock_embedding_function import (
-            AmazonBedrockEmbeddingFunction,
+        bedrock_ef = _lazy_module(
+            "chromadb.utils.embedding_functions.amazon_bedrock_embedding_function"
         )
 
-        return AmazonBedrockEmbeddingFunction(
-            session=config.get("session"),
+        return _maybe_parallel(
+            bedrock_ef.AmazonBedrockEmbeddingFunction(
+                session=config.get("session"),
+            ),
+            config,
         )
 
     @staticmethod
     def _configure_huggingface(config, model_name):
-        from chromadb.utils.embedding_functions.huggingface_embedding_function import (
-            HuggingFaceEmbeddingServer,
+        huggingface_ef = _lazy_module(
+            "chromadb.utils.embedding_functions.huggingface_embedding_function"
         )
 
-        return HuggingFaceEmbeddingServer(
-            url=config.get("api_url"),
+        return _maybe_parallel(
+            huggingface_ef.HuggingFaceEmbeddingServer(
+                url=config.get("api_url"),
+            ),
+            config,
         )
 
     @staticmethod
     def _configure_watson(config, model_name):
-        try:
-            import ibm_watsonx_ai.foundation_models as watson_models
-            from ibm_watsonx_ai import Credentials
-            from ibm_watsonx_ai.metanames import EmbedTextParamsMetaNames as EmbedParams
-        except ImportError as e:
-            raise ImportError(
-                "IBM Watson dependencies are not installed. Please install them to use Watson embedding."
-            ) from e
-
-        class WatsonEmbeddingFunction(EmbeddingFunction):
-            def __call__(self, input: Documents) -> Embeddings:
-                if isinstance(input, str):
-                    input = [input]
-
-                embed_params = {
-                    EmbedParams.TRUNCATE_INPUT_TOKENS: 3,
-                    EmbedParams.RETURN_OPTIONS: {"input_text": True},
-                }
-
-                embedding = watson_models.Embeddings(
-                    model_id=config.get("model"),
-                    params=embed_params,
-                    credentials=Credentials(
-                        api_key=config.get("api_key"), url=config.get("api_url")
-                    ),
-                    project_id=config.get("project_id"),
-                )
-
-                try:
-                    embeddings = embedding.embed_documents(input)
-                    return cast(Embeddings, embeddings)
-                except Exception as e:
-                    print("Error during Watson embedding:", e)
-                    raise e
-
-        return WatsonEmbeddingFunction()
+        return _get_watson_embedding_function_cls()(config)
+
+    _PROVIDERS: ClassVar[dict[str, Callable]] = {
+        "openai": _configure_openai.__func__,
+        "azure": _configure_azure.__func__,
+        "ollama": _configure_ollama.__func__,
+        "vertexai": _configure_vertexai.__func__,
+        "google": _configure_google.__func__,
+        "cohere": _configure_cohere.__func__,
+        "bedrock": _configure_bedrock.__func__,
+        "huggingface": _configure_huggingface.__func__,
+        "watson": _configure_watson.__func__,
+    }
+
+    #: Canonical set of supported provider names; lets callers check support
+    #: without instantiating the configurator.
+    SUPPORTED_PROVIDERS: ClassVar[frozenset] = frozenset(_PROVIDERS)
+    _SUPPORTED_TUPLE: ClassVar[tuple] = tuple(sorted(_PROVIDERS))
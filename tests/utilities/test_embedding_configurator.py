@@ -0,0 +1,172 @@
+import pytest
+
+from crewai.utilities.embedding_configurator import (
+    EmbeddingConfigurator,
+    _get_caching_embedding_function_cls,
+    _get_concurrent_embedding_function_cls,
+)
+
+
+def _vector(text):
+    return [float(len(text)), float(sum(map(ord, text)))]
+
+
+def _rows(result):
+    # chromadb's EmbeddingFunction.__init_subclass__ rewraps __call__ and
+    # returns numpy rows, so normalize before comparing against plain lists.
+    return [[float(value) for value in row] for row in result]
+
+
+class CountingInner:
+    """Stand-in embedding function that records every batch it receives."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return [_vector(text) for text in input]
+
+
+@pytest.fixture
+def caching_cls():
+    return _get_caching_embedding_function_cls()
+
+
+def test_cache_hits_skip_inner_calls(caching_cls):
+    inner = CountingInner()
+    embed = caching_cls(inner)
+
+    first = embed(["alpha", "beta"])
+    second = embed(["alpha", "beta"])
+
+    assert _rows(second) == _rows(first)
+    assert inner.calls == [["alpha", "beta"]]
+
+
+def test_cache_mixed_hit_miss_batch(caching_cls):
+    inner = CountingInner()
+    embed = caching_cls(inner)
+
+    embed(["alpha", "beta"])
+    result = embed(["alpha", "gamma"])
+
+    assert _rows(result) == [_vector("alpha"), _vector("gamma")]
+    assert inner.calls == [["alpha", "beta"], ["gamma"]]
+
+
+def test_cache_hit_on_oldest_entry_survives_eviction(caching_cls, monkeypatch):
+    monkeypatch.setattr(caching_cls, "_CAP", 3)
+    embed = caching_cls(CountingInner())
+
+    embed(["a", "b", "c"])
+    result = embed(["a", "d", "e"])
+
+    assert _rows(result) == [_vector("a"), _vector("d"), _vector("e")]
+
+
+def test_cache_batch_larger_than_capacity(caching_cls, monkeypatch):
+    monkeypatch.setattr(caching_cls, "_CAP", 3)
+    embed = caching_cls(CountingInner())
+
+    texts = [f"x{i}" for i in range(5)]
+
+    assert _rows(embed(texts)) == [_vector(text) for text in texts]
+    assert len(embed._cache) == 3
+
+
+def test_cache_int8_quantized_round_trip(caching_cls, monkeypatch):
+    monkeypatch.setenv("CREWAI_EMBED_QUANT", "int8")
+    embed = caching_cls(CountingInner())
+
+    expected = _vector("alpha")
+    embed(["alpha"])
+    hit = embed(["alpha"])[0]
+
+    scale = max(abs(value) for value in expected) / 127
+    assert hit == pytest.approx(expected, abs=scale)
+
+
+def test_cache_fp16_quantized_round_trip(caching_cls, monkeypatch):
+    monkeypatch.setenv("CREWAI_EMBED_QUANT", "fp16")
+    embed = caching_cls(CountingInner())
+
+    expected = _vector("alpha")
+    embed(["alpha"])
+    hit = embed(["alpha"])[0]
+
+    assert hit == pytest.approx(expected, rel=1e-3)
+
+
+def test_embed_and_normalize_rows_are_unit_length(caching_cls):
+    embed = caching_cls(CountingInner())
+
+    matrix = embed.embed_and_normalize(["alpha", "beta"])
+
+    assert matrix.shape == (2, 2)
+    assert matrix.dtype.name == "float32"
+    for row in matrix:
+        assert float((row**2).sum()) == pytest.approx(1.0, rel=1e-5)
+    assert embed.as_matrix() is matrix
+
+
+def test_embed_and_normalize_empty_input(caching_cls):
+    embed = caching_cls(CountingInner())
+
+    matrix = embed.embed_and_normalize([])
+
+    assert matrix.shape == (0, 0)
+
+
+def test_concurrent_wrapper_preserves_order():
+    inner = CountingInner()
+    embed = _get_concurrent_embedding_function_cls()(inner, max_concurrency=2)
+
+    texts = [f"t{i}" for i in range(6)]
+
+    assert _rows(embed(texts)) == [_vector(text) for text in texts]
+    assert sorted(call[0] for call in inner.calls) == texts
+
+
+def test_concurrent_wrapper_single_document_stays_sequential():
+    inner = CountingInner()
+    embed = _get_concurrent_embedding_function_cls()(inner)
+
+    embed(["solo"])
+
+    assert inner.calls == [["solo"]]
+
+
+def test_provider_name_is_normalized():
+    embed = EmbeddingConfigurator().configure_embedder(
+        {
+            "provider": " OpenAI ",
+            "config": {"api_key": "test-key", "model": "text-embedding-3-small"},
+        }
+    )
+
+    assert type(embed).__name__ == "OpenAIEmbeddingFunction"
+
+
+def test_identical_configs_return_cached_instance():
+    config = {
+        "provider": "openai",
+        "config": {"api_key": "memo-key", "model": "text-embedding-3-small"},
+    }
+
+    first = EmbeddingConfigurator().configure_embedder(config)
+    second = EmbeddingConfigurator().configure_embedder(dict(config))
+
+    assert second is first
+
+
+def test_unsupported_provider_raises():
+    with pytest.raises(Exception, match="Unsupported embedding provider"):
+        EmbeddingConfigurator().configure_embedder({"provider": "does-not-exist"})
+
+
+def test_supported_providers_exposed():
+    assert "openai" in EmbeddingConfigurator.SUPPORTED_PROVIDERS
+    assert EmbeddingConfigurator.SUPPORTED_PROVIDERS == frozenset(
+        EmbeddingConfigurator._PROVIDERS
+    )